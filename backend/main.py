@@ -3,32 +3,82 @@ Farm Monitor API - Main Application
 Zero-cost farm monitoring with satellite & weather analysis
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
-from datetime import datetime, timedelta
+from fastapi.responses import FileResponse, JSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Dict, Optional, List, Tuple
+from datetime import date, datetime, timedelta
 from contextlib import asynccontextmanager
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from cachetools import TTLCache
+import asyncio
+import functools
+import hashlib
+import httpx
 import logging
 import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+import numpy as np
 
 # Import services
 from services.weather import WeatherService
 from services.satellite import SatelliteService
 from services.analysis import AgronomicAnalyzer
-from services.pdf_gen import PDFGenerator
+from services.pdf_gen import generate_report_in_worker, init_pdf_worker
 from services.localization import normalize_lang
+from services.cache import cached_call
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Setup logging (INFO while developing, WARNING in production unless overridden)
+logging.basicConfig(
+    level=os.getenv(
+        "LOG_LEVEL",
+        "INFO" if os.getenv("ENVIRONMENT", "production") == "development" else "WARNING"
+    ).upper()
+)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers on startup, stop them on shutdown"""
+    # PDF rendering is CPU-bound; run it in worker processes so it doesn't
+    # block the event loop. The pool is per web worker, so keep it small.
+    pdf_workers = int(os.getenv("PDF_WORKERS", 2))
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    app.state.pdf_pool = ProcessPoolExecutor(
+        max_workers=pdf_workers,
+        initializer=init_pdf_worker
+    )
+    # Start the pool now so the first report doesn't pay for process start-up
+    # and PDFGenerator set-up. With the default fork start method the first
+    # submit forks all PDF_WORKERS processes at once (on-demand spawning is
+    # off for fork), which is why the per-worker default is small.
+    await asyncio.get_running_loop().run_in_executor(app.state.pdf_pool, os.getpid)
+    refresh_task = asyncio.create_task(refresh_loop())
+    try:
+        yield
+    finally:
+        refresh_task.cancel()
+        try:
+            await refresh_task
+        except asyncio.CancelledError:
+            pass
+        app.state.pdf_pool.shutdown(wait=False, cancel_futures=True)
+        await http_client.aclose()
+        if redis_client is not None:
+            await redis_client.aclose()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Farm Monitor API",
     description="Satellite health & weather analysis for farms",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -44,7 +94,12 @@ app.add_middleware(
 # Data Models
 # ===========================
 
+# Request models are read-only once validated; unknown fields are dropped.
+REQUEST_MODEL_CONFIG = ConfigDict(frozen=True, extra="ignore")
+
 class PolygonCoordinates(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     type: str = Field(default="Polygon")
     coordinates: List[List[List[float]]]
 
@@ -61,19 +116,29 @@ class PolygonCoordinates(BaseModel):
         return v
 
 class CenterPoint(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     lat: float
     lng: float
 
 class FarmReportRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     farm_name: str = Field(..., min_length=1, max_length=100)
     crop_type: str = Field(..., min_length=1)
     email: Optional[str] = None
-    planting_date: Optional[str] = None
+    planting_date: Optional[date] = None
     language: Optional[str] = Field(default="en", description="Report language: en, hi, gu")
     polygon: PolygonCoordinates
     area: float = Field(..., gt=0)
     center: CenterPoint
 
+    @field_validator("planting_date", mode="before")
+    @classmethod
+    def empty_planting_date(cls, v: object) -> object:
+        # The form sends "" when the optional date field is left blank
+        return None if v == "" else v
+
     @field_validator("language", mode="before")
     @classmethod
     def normalize_language(cls, v: object) -> str:
@@ -93,10 +158,146 @@ class FarmReportResponse(BaseModel):
 # Service Initialization
 # ===========================
 
-weather_service = WeatherService()
+# One pooled HTTP client for all upstream APIs, so TLS handshakes and
+# keep-alive connections are reused across requests.
+http_client = httpx.AsyncClient(
+    http2=True,
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=100, max_connections=500)
+)
+
+# Optional shared weather cache, so all workers (and restarts) reuse
+# Open-Meteo responses; disabled unless REDIS_URL is set.
+REDIS_URL = os.getenv("REDIS_URL")
+redis_client = None
+if REDIS_URL:
+    import redis.asyncio as aioredis
+    redis_client = aioredis.from_url(REDIS_URL)
+
+weather_service = WeatherService(
+    client=http_client,
+    redis=redis_client,
+    # Set WEATHER_SPLIT_REQUESTS=1 to use the ERA5 archive endpoint for history
+    combined_request=os.getenv("WEATHER_SPLIT_REQUESTS") != "1"
+)
 satellite_service = SatelliteService()
 analyzer = AgronomicAnalyzer()
-pdf_generator = PDFGenerator()
+
+# ===========================
+# Upstream Response Caches
+# ===========================
+
+# Forecasts refresh ~every 15 min; Sentinel-2 revisits every ~5 days, but the
+# imagery window slides daily, so satellite entries are also keyed by date.
+weather_cache = TTLCache(maxsize=1024, ttl=900)
+satellite_cache = TTLCache(maxsize=1024, ttl=6 * 3600)
+
+def _weather_key(lat: float, lng: float) -> tuple:
+    """Quantize coordinates so nearby farms share a weather cache entry"""
+    # Same grid the service queries and keys Redis on, so both caches agree
+    return weather_service.quantize(lat, lng)
+
+def _validate_ring(ring: np.ndarray):
+    """Reject rings that aren't a closed GeoJSON ring of valid [lng, lat] points"""
+    if ring.ndim != 2 or ring.shape[1] != 2:
+        raise HTTPException(status_code=422, detail="Polygon ring must be a list of [lng, lat] points")
+    if ring.shape[0] < 4:
+        raise HTTPException(status_code=422, detail="Polygon ring needs at least 4 points")
+    if not (ring[0] == ring[-1]).all():
+        raise HTTPException(status_code=422, detail="Polygon ring must be closed (first point equal to last)")
+    lo = ring.min(axis=0)
+    hi = ring.max(axis=0)
+    if not (np.isfinite(lo).all() and np.isfinite(hi).all()):
+        raise HTTPException(status_code=422, detail="Polygon coordinates must be finite numbers")
+    if lo[0] < -180 or hi[0] > 180 or lo[1] < -90 or hi[1] > 90:
+        raise HTTPException(status_code=422, detail="Polygon coordinates out of range (lng ±180, lat ±90)")
+
+def _ring_from_request(request: FarmReportRequest) -> np.ndarray:
+    """Outer polygon ring as a validated (N, 2) float64 [lng, lat] array"""
+    try:
+        ring = np.asarray(request.polygon.coordinates[0], dtype=np.float64)
+    except (IndexError, ValueError):
+        raise HTTPException(status_code=422, detail="Polygon ring must be a list of [lng, lat] points")
+    _validate_ring(ring)
+    return ring
+
+def _polygon_key(ring: np.ndarray) -> bytes:
+    """Stable digest of the polygon geometry for satellite cache keys"""
+    return hashlib.blake2b(ring.tobytes(), digest_size=16).digest()
+
+def _weather_cacheable(data: dict) -> bool:
+    # Don't pin the fallback or an empty result for the full TTL after an outage
+    return "error" not in data and any(
+        data.get(part, {}).get("dates") for part in ("historical", "forecast")
+    )
+
+async def get_cached_weather(lat: float, lng: float) -> dict:
+    return await cached_call(
+        weather_cache,
+        _weather_key(lat, lng),
+        lambda: weather_service.get_weather_analysis(latitude=lat, longitude=lng),
+        cacheable=_weather_cacheable
+    )
+
+async def refresh_weather(farms: List[Tuple[float, float]]):
+    """Refetch weather for (lat, lng) points concurrently, one per cache cell"""
+    points = {_weather_key(lat, lng): (lat, lng) for lat, lng in farms}
+    results = await weather_service.get_weather_analysis_many(list(points.values()))
+    for key, data in zip(points, results):
+        if isinstance(data, Exception):
+            logger.warning("Background weather refresh failed: %s", data)
+        elif _weather_cacheable(data):
+            weather_cache[key] = data
+
+async def get_cached_satellite(polygon_key: bytes, ring: np.ndarray, lat: float, lng: float) -> dict:
+    return await cached_call(
+        satellite_cache,
+        (polygon_key, date.today()),
+        lambda: satellite_service.get_ndvi_analysis(
+            ring=ring,
+            center_lat=lat,
+            center_lng=lng
+        ),
+        # Mock fallbacks mean GEE was unavailable; retry on the next request
+        cacheable=lambda data: not data.get('mock_data')
+    )
+
+# ===========================
+# Background Cache Refresh
+# ===========================
+
+# Farms from the most recent reports, refreshed ahead of cache expiry
+RECENT_FARMS_MAX = 64
+REFRESH_INTERVAL_SECONDS = 600
+
+recent_farms: "OrderedDict[bytes, Tuple[float, float, np.ndarray]]" = OrderedDict()
+
+def _remember_farm(polygon_key: bytes, lat: float, lng: float, ring: np.ndarray):
+    recent_farms[polygon_key] = (lat, lng, ring)
+    recent_farms.move_to_end(polygon_key)
+    while len(recent_farms) > RECENT_FARMS_MAX:
+        recent_farms.popitem(last=False)
+
+async def refresh_loop():
+    """Keep weather/satellite caches warm for recently reported farms"""
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(_prune_reports)
+        except OSError as e:
+            logger.warning("Report cleanup failed: %s", e)
+        farms = list(recent_farms.items())
+        try:
+            # Weather TTL (15 min) outlives the interval, so refresh every pass
+            await refresh_weather([(lat, lng) for _, (lat, lng, _ring) in farms])
+        except Exception as e:
+            logger.warning("Background refresh failed: %s", e)
+        for polygon_key, (lat, lng, ring) in farms:
+            try:
+                # NDVI entries live 6 h (satellite_cache TTL); only refetch once expired
+                await get_cached_satellite(polygon_key, ring, lat, lng)
+            except Exception as e:
+                logger.warning("Background refresh failed: %s", e)
 
 # ===========================
 # Routes
@@ -128,48 +329,86 @@ async def health_check():
         }
     }
 
-@app.post("/api/generate-report", response_model=FarmReportResponse)
-async def generate_report(request: FarmReportRequest, background_tasks: BackgroundTasks):
-    """
-    Generate farm monitoring report with satellite and weather data
-    """
-    try:
-        logger.info(f"Generating report for farm: {request.farm_name}")
-        
-        # Extract coordinates
-        center_lat = request.center.lat
-        center_lng = request.center.lng
-        polygon_coords = request.polygon.coordinates
-        
-        # 1. Fetch Weather Data
-        logger.info("Fetching weather data...")
-        weather_data = await weather_service.get_weather_analysis(
-            latitude=center_lat,
-            longitude=center_lng
-        )
-        
-        # 2. Fetch Satellite Data and Calculate NDVI
-        logger.info("Fetching satellite data...")
-        satellite_data = await satellite_service.get_ndvi_analysis(
-            polygon_coords=polygon_coords,
-            center_lat=center_lat,
-            center_lng=center_lng
-        )
-        
-        # 3. Perform Agronomic Analysis
-        logger.info("Analyzing data...")
-        analysis = analyzer.analyze(
-            weather_data=weather_data,
-            satellite_data=satellite_data,
-            crop_type=request.crop_type,
-            planting_date=request.planting_date,
-            area=request.area,
-            language=request.language
+# In-flight report pipelines keyed by request fingerprint, so concurrent
+# identical requests (e.g. two open tabs) share a single run.
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Generated PDFs are written here and served by /api/download/{filename};
+# the refresh loop deletes them once they are older than REPORT_MAX_AGE_SECONDS
+REPORT_DIR = os.path.join(tempfile.gettempdir(), "farm-reports")
+REPORT_MAX_AGE_SECONDS = 24 * 3600
+# Report files are named <uuid4 hex>.pdf; nothing else is downloadable
+REPORT_FILENAME_RE = re.compile(r"[0-9a-f]{32}\.pdf")
+
+def _prune_reports():
+    """Delete generated reports older than REPORT_MAX_AGE_SECONDS"""
+    cutoff = time.time() - REPORT_MAX_AGE_SECONDS
+    with os.scandir(REPORT_DIR) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                # Already gone (another worker pruned it) or not ours to delete
+                pass
+
+def _report_fingerprint(request: FarmReportRequest, inline_pdf: bool) -> str:
+    """Fingerprint of every request field that affects the generated report"""
+    payload = request.model_dump_json(exclude={"email"}) + ("|inline" if inline_pdf else "")
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+async def _build_report(request: FarmReportRequest, inline_pdf: bool) -> Tuple[FarmReportResponse, Dict]:
+    """Run the weather/satellite/analysis/PDF pipeline for one request"""
+    # Extract coordinates
+    center_lat = request.center.lat
+    center_lng = request.center.lng
+    # Outer ring as an (N, 2) [lng, lat] array, shared by every downstream step.
+    # Validated here so bad geometry fails before any upstream call.
+    ring = _ring_from_request(request)
+    polygon_key = _polygon_key(ring)
+    _remember_farm(polygon_key, center_lat, center_lng, ring)
+    
+    # 1-2. Fetch Weather and Satellite Data concurrently
+    logger.info("Fetching weather and satellite data...")
+    weather_data, satellite_data = await asyncio.gather(
+        get_cached_weather(center_lat, center_lng),
+        get_cached_satellite(polygon_key, ring, center_lat, center_lng),
+        return_exceptions=True
+    )
+    
+    errors = {
+        name: result
+        for name, result in (("weather", weather_data), ("satellite", satellite_data))
+        if isinstance(result, BaseException)
+    }
+    if errors:
+        for name, error in errors.items():
+            logger.error("Error fetching %s data: %s", name, error)
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to fetch {' and '.join(errors)} data"
         )
-        
-        # 4. Generate PDF Report
-        logger.info("Generating PDF...")
-        pdf_result = pdf_generator.generate_report(
+    
+    # 3. Perform Agronomic Analysis
+    logger.info("Analyzing data...")
+    analysis = analyzer.analyze(
+        weather_data=weather_data,
+        satellite_data=satellite_data,
+        crop_type=request.crop_type,
+        planting_date=request.planting_date,
+        area=request.area,
+        language=request.language
+    )
+    
+    # 4. Generate PDF Report, written straight to REPORT_DIR unless the
+    #    client asked for it inline
+    logger.info("Generating PDF...")
+    report_filename = None if inline_pdf else f"{uuid.uuid4().hex}.pdf"
+    pdf_result = await asyncio.get_running_loop().run_in_executor(
+        app.state.pdf_pool,
+        functools.partial(
+            generate_report_in_worker,
+            output_path=report_filename and os.path.join(REPORT_DIR, report_filename),
             farm_name=request.farm_name,
             crop_type=request.crop_type,
             area=request.area,
@@ -179,62 +418,123 @@ async def generate_report(request: FarmReportRequest, background_tasks: Backgrou
             analysis=analysis,
             language=request.language
         )
+    )
+    
+    # 5. Reference the stored file, or embed the inline copy
+    pdf_url = f"/api/download/{report_filename}" if report_filename else None
+    pdf_base64 = pdf_result.get('pdf_base64')
+    
+    # 6. Prepare response
+    response = FarmReportResponse(
+        farm_name=request.farm_name,
+        crop_type=request.crop_type,
+        area=request.area,
+        ndvi_value=satellite_data.get('ndvi_mean'),
+        health_status=analysis.get('health_status', 'Good'),
+        # API clients get the recommendations as one ' | '-separated string
+        recommendations=" | ".join(analysis.get('recommendations', ())),
+        pdf_url=pdf_url,
+        pdf_base64=pdf_base64
+    )
+    
+    return response, pdf_result
+
+async def _build_report_once(request: FarmReportRequest, inline_pdf: bool) -> Tuple[FarmReportResponse, Dict]:
+    """Join an identical in-flight pipeline if there is one, else start it"""
+    key = _report_fingerprint(request, inline_pdf)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_build_report(request, inline_pdf))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        logger.info("Joining in-flight report for farm: %s", request.farm_name)
+    
+    # Shield so one client disconnecting doesn't cancel the run for the others
+    return await asyncio.shield(task)
+
+@app.post("/api/generate-report", response_model=FarmReportResponse)
+async def generate_report(
+    request: FarmReportRequest,
+    background_tasks: BackgroundTasks,
+    x_return_pdf: Optional[str] = Header(default=None)
+):
+    """
+    Generate farm monitoring report with satellite and weather data
+
+    The PDF is saved for download and returned as pdf_url; send
+    `X-Return-PDF: inline` to receive it as pdf_base64 instead.
+    """
+    try:
+        logger.info("Generating report for farm: %s", request.farm_name)
         
-        # 5. Prepare response
-        response = FarmReportResponse(
-            farm_name=request.farm_name,
-            crop_type=request.crop_type,
-            area=request.area,
-            ndvi_value=satellite_data.get('ndvi_mean'),
-            health_status=analysis.get('health_status', 'Good'),
-            recommendations=analysis.get('recommendations', ''),
-            pdf_base64=pdf_result.get('pdf_base64')
-        )
+        inline_pdf = (x_return_pdf or "").lower() == "inline"
+        response, pdf_result = await _build_report_once(request, inline_pdf)
         
-        logger.info(f"Report generated successfully for {request.farm_name}")
+        logger.info("Report generated successfully for %s", request.farm_name)
         
         # Send email in background if provided
         if request.email:
             background_tasks.add_task(
                 send_email_report,
                 email=request.email,
-                pdf_base64=pdf_result.get('pdf_base64'),
-                farm_name=request.farm_name
+                farm_name=request.farm_name,
+                pdf_url=response.pdf_url,
+                pdf_base64=response.pdf_base64
             )
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error generating report: {str(e)}", exc_info=True)
+        logger.error("Error generating report: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate report: {str(e)}"
         )
 
 @app.get("/api/download/{filename}")
-async def download_report(filename: str):
+async def download_report(filename: str, if_none_match: Optional[str] = Header(default=None)):
     """Download generated PDF report"""
-    file_path = f"/tmp/{filename}"
+    if not REPORT_FILENAME_RE.fullmatch(filename):
+        raise HTTPException(status_code=404, detail="Report not found")
+    file_path = os.path.join(REPORT_DIR, filename)
     
-    if not os.path.exists(file_path):
+    try:
+        stat = await asyncio.to_thread(os.stat, file_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="Report not found")
     
+    # Reports are written once, so the mtime identifies the content
+    etag = f'"{stat.st_mtime_ns:x}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    
     return FileResponse(
         path=file_path,
         filename=filename,
-        media_type="application/pdf"
+        media_type="application/pdf",
+        headers=headers,
+        stat_result=stat
     )
 
 # ===========================
 # Background Tasks
 # ===========================
 
-async def send_email_report(email: str, pdf_base64: str, farm_name: str):
+async def send_email_report(
+    email: str,
+    farm_name: str,
+    pdf_url: Optional[str] = None,
+    pdf_base64: Optional[str] = None
+):
     """
     Send email with PDF report (placeholder)
     In production, integrate with SendGrid, Mailgun, or similar
     """
-    logger.info(f"Would send email to {email} for farm {farm_name}")
+    logger.info("Would send email to %s for farm %s", email, farm_name)
     # TODO: Implement email sending
     pass
 
@@ -244,10 +544,19 @@ async def send_email_report(email: str, pdf_base64: str, farm_name: str):
 
 if __name__ == "__main__":
     import uvicorn
+    # Auto-reload is a development convenience and can't be combined with
+    # multiple workers. In production prefer:
+    #   gunicorn main:app -k uvicorn.workers.UvicornWorker -w $WEB_WORKERS
+    dev_mode = os.getenv("ENVIRONMENT", "production") == "development"
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", 8000)),
+        reload=dev_mode,
+        workers=1 if dev_mode else int(os.getenv("WEB_WORKERS", os.cpu_count() or 1)),
+        limit_concurrency=int(os.getenv("MAX_CONCURRENCY", 200)),
+        # uvloop has no Windows build; fall back to the stdlib loop there
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info"
     )
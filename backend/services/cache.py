@@ -0,0 +1,58 @@
+"""
+Caching helpers
+In-memory TTL caching with per-key single-flight for async service calls
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, MutableMapping, Optional
+
+
+# (id(cache), key) -> [lock, number of callers holding or waiting on it]
+_locks: Dict[Hashable, List] = {}
+
+
+async def cached_call(
+    cache: MutableMapping,
+    key: Hashable,
+    coro_factory: Callable[[], Awaitable[Any]],
+    cacheable: Optional[Callable[[Any], bool]] = None
+) -> Any:
+    """
+    Return cache[key], computing it with coro_factory() on a miss
+
+    Concurrent misses for the same key share one lock, so only the first
+    caller hits the upstream service and the rest read its result.
+
+    Args:
+        cache: Mapping to store results in (e.g. cachetools.TTLCache)
+        key: Cache key
+        coro_factory: Zero-argument callable returning the awaitable to run on a miss
+        cacheable: Optional predicate; results it rejects are returned but not stored
+    """
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+
+    lock_key = (id(cache), key)
+    entry = _locks.get(lock_key)
+    if entry is None:
+        entry = _locks[lock_key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            try:
+                return cache[key]
+            except KeyError:
+                pass
+
+            result = await coro_factory()
+            if cacheable is None or cacheable(result):
+                cache[key] = result
+            return result
+    finally:
+        # A released lock isn't re-acquired by the next waiter until that
+        # waiter runs, so locked() can't tell whether anyone still needs it
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _locks[lock_key]
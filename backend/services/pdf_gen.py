@@ -4,7 +4,7 @@ Creates professional farm monitoring reports
 """
 
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
@@ -12,7 +12,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from datetime import datetime
-from typing import Dict, Optional
+from bisect import bisect_left, bisect_right
+from typing import BinaryIO, Dict, Optional
 import io
 import base64
 import logging
@@ -21,48 +22,134 @@ from xml.sax.saxutils import escape as xml_escape
 
 logger = logging.getLogger(__name__)
 
-from services.localization import normalize_lang, t as tr
+from services.localization import DEFAULT_LANG, SUPPORTED_LANGS, normalize_lang, t as tr
 
 
-class PDFGenerator:
-    """Generate PDF reports for farm monitoring"""
+# Script fonts for non-Latin report languages; everything else uses Helvetica
+_SCRIPT_FONTS = {"hi": "NotoSansDevanagari", "gu": "NotoSansGujarati"}
+
+# Brand colours, parsed once
+_GREEN = colors.HexColor('#2d6a4f')
+_ROW_ALT = colors.HexColor('#f8f9fa')
+_DARK_GREEN = colors.HexColor('#1b4332')
+
+
+def _register_fonts():
+    """Register the bundled Noto fonts with ReportLab, if present"""
+    # Keep fonts inside repo so Render/local runs are consistent.
+    base_dir = os.path.dirname(os.path.dirname(__file__))  # backend/
+    fonts_dir = os.path.join(base_dir, "assets", "fonts")
+
+    noto_sans = os.path.join(fonts_dir, "NotoSans-Regular.ttf")
+    noto_deva = os.path.join(fonts_dir, "NotoSansDevanagari-Regular.ttf")
+    noto_guj = os.path.join(fonts_dir, "NotoSansGujarati-Regular.ttf")
+
+    try:
+        if os.path.exists(noto_sans):
+            pdfmetrics.registerFont(TTFont("NotoSans", noto_sans))
+        if os.path.exists(noto_deva):
+            pdfmetrics.registerFont(TTFont("NotoSansDevanagari", noto_deva))
+        if os.path.exists(noto_guj):
+            pdfmetrics.registerFont(TTFont("NotoSansGujarati", noto_guj))
+    except Exception as e:
+        logger.warning("Font registration failed, falling back to Helvetica: %s", e)
+
+
+def _build_styles(language: str) -> StyleSheet1:
+    """Build the report stylesheet for one language"""
+    styles = getSampleStyleSheet()
+
+    font_regular = _SCRIPT_FONTS.get(language, "Helvetica")
+    font_bold = "Helvetica-Bold" if font_regular == "Helvetica" else font_regular
     
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._font_registered = False
-        self._setup_custom_styles(language="en")
+    # Title style
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=_GREEN,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName=font_bold
+    ))
     
-    def _register_fonts_if_available(self):
-        if self._font_registered:
-            return
-
-        # Keep fonts inside repo so Render/local runs are consistent.
-        base_dir = os.path.dirname(os.path.dirname(__file__))  # backend/
-        fonts_dir = os.path.join(base_dir, "assets", "fonts")
+    # Section header
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=_GREEN,
+        spaceAfter=12,
+        spaceBefore=12,
+        fontName=font_bold
+    ))
+    
+    # Metric style
+    styles.add(ParagraphStyle(
+        name='Metric',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=6,
+        fontName=font_regular
+    ))
+    
+    # Recommendation style
+    styles.add(ParagraphStyle(
+        name='Recommendation',
+        parent=styles['Normal'],
+        fontSize=10,
+        leftIndent=20,
+        spaceAfter=8,
+        fontName=font_regular,
+        textColor=_DARK_GREEN
+    ))
+
+    return styles
+
+
+# Summary colour for each (English) health status
+_HEALTH_COLORS = {
+    'Excellent': '#2d6a4f',
+    'Good': '#40916c',
+    'Moderate': '#f4a261',
+    'Poor': '#e76f51',
+    'Critical': '#c1121f'
+}
+
+# Table styles are immutable once built, so every report shares them
+_HEADER_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
+_SECTION_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), _GREEN),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, _ROW_ALT]),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+])
+
+# Fonts and per-language stylesheets are built once at import and shared
+_register_fonts()
+_STYLES: Dict[str, StyleSheet1] = {lang: _build_styles(lang) for lang in SUPPORTED_LANGS}
+
+# Table cell styles, created on first use and shared by all later reports
+_CELL_STYLES: Dict[tuple, ParagraphStyle] = {}
 
-        noto_sans = os.path.join(fonts_dir, "NotoSans-Regular.ttf")
-        noto_deva = os.path.join(fonts_dir, "NotoSansDevanagari-Regular.ttf")
-        noto_guj = os.path.join(fonts_dir, "NotoSansGujarati-Regular.ttf")
 
-        try:
-            if os.path.exists(noto_sans):
-                pdfmetrics.registerFont(TTFont("NotoSans", noto_sans))
-            if os.path.exists(noto_deva):
-                pdfmetrics.registerFont(TTFont("NotoSansDevanagari", noto_deva))
-            if os.path.exists(noto_guj):
-                pdfmetrics.registerFont(TTFont("NotoSansGujarati", noto_guj))
-            self._font_registered = True
-        except Exception as e:
-            logger.warning(f"Font registration failed, falling back to Helvetica: {e}")
-            self._font_registered = True
+class PDFGenerator:
+    """Generate PDF reports for farm monitoring"""
+    
+    def __init__(self):
+        self.styles = _STYLES[DEFAULT_LANG]
 
     def _font_name_for_lang(self, language: str) -> str:
-        lang = normalize_lang(language)
-        if lang == "hi":
-            return "NotoSansDevanagari"
-        if lang == "gu":
-            return "NotoSansGujarati"
-        return "Helvetica"
+        return _SCRIPT_FONTS.get(normalize_lang(language), "Helvetica")
 
     def _latin_font_name(self) -> str:
         # Prefer NotoSans if available; otherwise Helvetica is fine for ASCII.
@@ -122,66 +209,20 @@ class PDFGenerator:
         return "".join(out)
 
     def _para(self, text: str, font_name: str, font_size: int = 10, color=colors.black, bold: bool = False) -> Paragraph:
-        name = f"_tmp_{font_name}_{font_size}_{'b' if bold else 'r'}"
-        style = ParagraphStyle(
-            name=name,
-            parent=self.styles["Normal"],
-            fontName=font_name,
-            fontSize=font_size,
-            textColor=color,
-            leading=font_size + 2,
-        )
+        key = (font_name, font_size, color, bold)
+        style = _CELL_STYLES.get(key)
+        if style is None:
+            name = f"_tmp_{font_name}_{font_size}_{'b' if bold else 'r'}"
+            style = _CELL_STYLES[key] = ParagraphStyle(
+                name=name,
+                parent=self.styles["Normal"],
+                fontName=font_name,
+                fontSize=font_size,
+                textColor=color,
+                leading=font_size + 2,
+            )
         return Paragraph(text, style)
 
-    def _setup_custom_styles(self, language: str = "en"):
-        """Setup custom paragraph styles"""
-        self._register_fonts_if_available()
-
-        font_regular = self._font_name_for_lang(language)
-        font_bold = "Helvetica-Bold" if font_regular == "Helvetica" else font_regular
-        
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2d6a4f'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName=font_bold
-        ))
-        
-        # Section header
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#2d6a4f'),
-            spaceAfter=12,
-            spaceBefore=12,
-            fontName=font_bold
-        ))
-        
-        # Metric style
-        self.styles.add(ParagraphStyle(
-            name='Metric',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            fontName=font_regular
-        ))
-        
-        # Recommendation style
-        self.styles.add(ParagraphStyle(
-            name='Recommendation',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            leftIndent=20,
-            spaceAfter=8,
-            fontName=font_regular,
-            textColor=colors.HexColor('#1b4332')
-        ))
-    
     def generate_report(
         self,
         farm_name: str,
@@ -191,23 +232,29 @@ class PDFGenerator:
         weather_data: Dict,
         satellite_data: Dict,
         analysis: Dict,
-        language: Optional[str] = "en"
+        language: Optional[str] = "en",
+        out_stream: Optional[BinaryIO] = None
     ) -> Dict:
         """
         Generate PDF report
         
+        Args:
+            out_stream: Optional binary file object to write the PDF to.
+                When given, no base64 copy is produced.
+        
         Returns:
-            Dictionary with pdf_base64 and filename
+            Dictionary with filename, plus pdf_base64 when out_stream is None
         """
         
         try:
             lang = normalize_lang(language)
-            # Recreate styles per language so correct font is used.
-            self.styles = getSampleStyleSheet()
-            self._setup_custom_styles(language=lang)
+            # One timestamp per report so header, footer and filename agree
+            now = datetime.now()
+            # Pick the prebuilt stylesheet so the correct font is used.
+            self.styles = _STYLES[lang]
 
-            # Create PDF in memory
-            buffer = io.BytesIO()
+            # Write to the caller's stream, or build in memory for base64
+            buffer = out_stream if out_stream is not None else io.BytesIO()
             doc = SimpleDocTemplate(
                 buffer,
                 pagesize=letter,
@@ -221,7 +268,7 @@ class PDFGenerator:
             story = []
             
             # Header
-            story.extend(self._create_header(farm_name, crop_type, area, center, lang))
+            story.extend(self._create_header(farm_name, crop_type, area, center, lang, now))
             
             # Executive Summary
             story.extend(self._create_summary(analysis, satellite_data, lang))
@@ -239,28 +286,27 @@ class PDFGenerator:
             story.extend(self._create_risk_section(analysis, lang))
             
             # Footer
-            story.extend(self._create_footer(lang))
+            story.extend(self._create_footer(lang, now))
             
             # Build PDF
             doc.build(story)
             
-            # Get PDF bytes
-            pdf_bytes = buffer.getvalue()
-            buffer.close()
-            
-            # Convert to base64
-            pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-            
-            return {
-                'pdf_base64': pdf_base64,
-                'filename': f"{farm_name.replace(' ', '_')}_report_{datetime.now().strftime('%Y%m%d')}.pdf"
+            result = {
+                'filename': f"{farm_name.replace(' ', '_')}_report_{now:%Y%m%d}.pdf"
             }
+            if out_stream is None:
+                # Convert to base64 straight from the buffer's memory (no bytes copy)
+                with buffer.getbuffer() as pdf_view:
+                    result['pdf_base64'] = base64.b64encode(pdf_view).decode('ascii')
+                buffer.close()
+            
+            return result
             
         except Exception as e:
-            logger.error(f"Error generating PDF: {str(e)}")
+            logger.error("Error generating PDF: %s", e)
             raise
     
-    def _create_header(self, farm_name: str, crop_type: str, area: float, center: Dict, lang: str) -> list:
+    def _create_header(self, farm_name: str, crop_type: str, area: float, center: Dict, lang: str, now: datetime) -> list:
         """Create report header"""
         story = []
         
@@ -280,7 +326,7 @@ class PDFGenerator:
         value_font = self._latin_font_name() if lang in ("hi", "gu") else self._font_name_for_lang(lang)
 
         def label_cell(k: str) -> Paragraph:
-            return self._para(self._mix_script_and_latin(tr(lang, k), lang), label_font, font_size=11, color=colors.HexColor('#2d6a4f'), bold=True)
+            return self._para(self._mix_script_and_latin(tr(lang, k), lang), label_font, font_size=11, color=_GREEN, bold=True)
 
         def value_cell(v: str) -> Paragraph:
             # Values often contain ASCII (names, coordinates, month names). Render with latin-safe font.
@@ -291,15 +337,11 @@ class PDFGenerator:
             [label_cell("crop_type"), value_cell(crop_type.title())],
             [label_cell("field_area"), value_cell(f"{area} {unit_hectares}")],
             [label_cell("location"), value_cell(f"{center['lat']:.4f}°N, {center['lng']:.4f}°E")],
-            [label_cell("report_date"), value_cell(datetime.now().strftime('%B %d, %Y'))],
+            [label_cell("report_date"), value_cell(now.strftime('%B %d, %Y'))],
         ]
         
         table = Table(data, colWidths=[2*inch, 4*inch])
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        table.setStyle(_HEADER_TABLE_STYLE)
         
         story.append(table)
         story.append(Spacer(1, 0.3*inch))
@@ -318,21 +360,13 @@ class PDFGenerator:
         ndvi = satellite_data.get('ndvi_mean', 0)
         
         # Health status with color coding
-        color_map = {
-            'Excellent': '#2d6a4f',
-            'Good': '#40916c',
-            'Moderate': '#f4a261',
-            'Poor': '#e76f51',
-            'Critical': '#c1121f'
-        }
-        
-        health_color = color_map.get(health_status_en, '#6c757d')
-        
-        summary_text = f"""
-        <b>{tr(lang, "crop_health_status")}</b> <font color="{health_color}"><b>{health_status}</b></font><br/>
-        <b>{tr(lang, "growth_stage")}</b> {growth_stage}<br/>
-        <b>{tr(lang, "vegetation_index")}</b> {ndvi:.3f}<br/>
-        """
+        health_color = _HEALTH_COLORS.get(health_status_en, '#6c757d')
+        
+        summary_text = (
+            f'<b>{tr(lang, "crop_health_status")}</b> <font color="{health_color}"><b>{health_status}</b></font><br/>'
+            f'<b>{tr(lang, "growth_stage")}</b> {growth_stage}<br/>'
+            f'<b>{tr(lang, "vegetation_index")}</b> {ndvi:.3f}<br/>'
+        )
         
         story.append(Paragraph(summary_text, self.styles['Metric']))
         story.append(Spacer(1, 0.2*inch))
@@ -381,16 +415,7 @@ class PDFGenerator:
         ]
         
         table = Table(data, colWidths=[2*inch, 1.5*inch, 2.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d6a4f')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        table.setStyle(_SECTION_TABLE_STYLE)
         
         story.append(table)
         story.append(Spacer(1, 0.2*inch))
@@ -438,16 +463,7 @@ class PDFGenerator:
         ]
         
         table = Table(data, colWidths=[2*inch, 1.5*inch, 2.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d6a4f')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        table.setStyle(_SECTION_TABLE_STYLE)
         
         story.append(table)
         story.append(Spacer(1, 0.2*inch))
@@ -460,14 +476,8 @@ class PDFGenerator:
         
         story.append(Paragraph(tr(lang, "agronomic_recommendations"), self.styles['SectionHeader']))
         
-        recommendations = analysis.get('recommendations', '')
-        
-        # Split recommendations by separator
-        rec_list = recommendations.split(' | ')
-        
-        for i, rec in enumerate(rec_list, 1):
-            rec_text = f"{i}. {rec.strip()}"
-            story.append(Paragraph(rec_text, self.styles['Recommendation']))
+        for i, rec in enumerate(analysis.get('recommendations', ()), 1):
+            story.append(Paragraph(f"{i}. {rec}", self.styles['Recommendation']))
         
         story.append(Spacer(1, 0.2*inch))
         
@@ -481,12 +491,6 @@ class PDFGenerator:
         
         risks = analysis.get('risks', {})
         
-        risk_colors = {
-            'Low': colors.HexColor('#2d6a4f'),
-            'Medium': colors.HexColor('#f4a261'),
-            'High': colors.HexColor('#e76f51')
-        }
-        
         script_font = self._font_name_for_lang(lang)
         latin_font = self._latin_font_name()
 
@@ -509,23 +513,14 @@ class PDFGenerator:
         ]
         
         table = Table(data, colWidths=[3*inch, 2*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d6a4f')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        table.setStyle(_SECTION_TABLE_STYLE)
         
         story.append(table)
         story.append(Spacer(1, 0.3*inch))
         
         return story
     
-    def _create_footer(self, lang: str) -> list:
+    def _create_footer(self, lang: str, now: datetime) -> list:
         """Create report footer"""
         story = []
         
@@ -539,7 +534,7 @@ class PDFGenerator:
         </font>
         </para>
         """.format(
-            datetime.now().strftime('%B %d, %Y at %I:%M %p'),
+            now.strftime('%B %d, %Y at %I:%M %p'),
             generated_by=tr(lang, "generated_by"),
             data_sources=tr(lang, "data_sources"),
             disclaimer=tr(lang, "automated_disclaimer"),
@@ -553,74 +548,91 @@ class PDFGenerator:
     
     def _interpret_ndvi(self, ndvi: float, lang: str = "en") -> str:
         """Interpret NDVI value"""
-        def pick(en: str, hi: str, gu: str) -> str:
-            if lang == "hi":
-                return hi
-            if lang == "gu":
-                return gu
-            return en
-
-        if ndvi > 0.6:
-            return pick("Excellent vegetation", "बहुत अच्छी वनस्पति", "ખૂબ સારી વનસ્પતિ")
-        elif ndvi > 0.4:
-            return pick("Good vegetation", "अच्छी वनस्पति", "સારી વનસ્પતિ")
-        elif ndvi > 0.3:
-            return pick("Moderate vegetation", "मध्यम वनस्पति", "મધ્યમ વનસ્પતિ")
-        else:
-            return pick("Low vegetation", "कम वनस्पति", "ઓછી વનસ્પતિ")
+        labels = _NDVI_LABELS.get(lang, _NDVI_LABELS["en"])
+        return labels[bisect_left(_NDVI_CUTOFFS, ndvi)]
     
     def _interpret_ndmi(self, ndmi: float, lang: str = "en") -> str:
         """Interpret NDMI value"""
-        def pick(en: str, hi: str, gu: str) -> str:
-            if lang == "hi":
-                return hi
-            if lang == "gu":
-                return gu
-            return en
-
-        if ndmi > 0.4:
-            return pick("High moisture", "अधिक नमी", "વધારે ભેજ")
-        elif ndmi > 0.2:
-            return pick("Adequate moisture", "पर्याप्त नमी", "પૂરતું ભેજ")
-        else:
-            return pick("Low moisture / stress", "कम नमी / तनाव", "ઓછું ભેજ / તાણ")
+        labels = _NDMI_LABELS.get(lang, _NDMI_LABELS["en"])
+        return labels[bisect_left(_NDMI_CUTOFFS, ndmi)]
     
     def _interpret_rainfall(self, rainfall: float, lang: str = "en") -> str:
         """Interpret rainfall amount"""
-        def pick(en: str, hi: str, gu: str) -> str:
-            if lang == "hi":
-                return hi
-            if lang == "gu":
-                return gu
-            return en
-
-        if rainfall < 20:
-            return pick("Very low - drought risk", "बहुत कम - सूखा जोखिम", "ખૂબ ઓછું - સૂકા જોખમ")
-        elif rainfall < 50:
-            return pick("Low - monitor closely", "कम - निगरानी करें", "ઓછું - નજીકથી નજર રાખો")
-        elif rainfall < 100:
-            return pick("Adequate", "पर्याप्त", "પૂરતું")
-        elif rainfall < 150:
-            return pick("Good", "अच्छा", "સારું")
-        else:
-            return pick("High - flood risk possible", "अधिक - बाढ़ जोखिम संभव", "વધારે - પૂર જોખમ શક્ય")
+        labels = _RAINFALL_LABELS.get(lang, _RAINFALL_LABELS["en"])
+        return labels[bisect_right(_RAINFALL_CUTOFFS, rainfall)]
     
     def _interpret_temperature(self, temp: float, lang: str = "en") -> str:
         """Interpret temperature"""
-        def pick(en: str, hi: str, gu: str) -> str:
-            if lang == "hi":
-                return hi
-            if lang == "gu":
-                return gu
-            return en
-
-        if temp < 10:
-            return pick("Cold - potential stress", "ठंडा - तनाव संभव", "ઠંડું - તાણ શક્ય")
-        elif temp < 20:
-            return pick("Cool - good for growth", "ठंडा - वृद्धि के लिए अच्छा", "ઠંડક - વૃદ્ધિ માટે સારું")
-        elif temp < 30:
-            return pick("Optimal range", "उत्तम सीमा", "ઉત્તમ શ્રેણી")
-        elif temp < 35:
-            return pick("Warm - monitor water", "गर्म - पानी पर नजर रखें", "ગરમ - પાણી પર નજર રાખો")
-        else:
-            return pick("Hot - heat stress risk", "बहुत गर्म - गर्मी तनाव जोखिम", "ખૂબ ગરમ - ઉષ્ણતા તાણ જોખમ")
+        labels = _TEMPERATURE_LABELS.get(lang, _TEMPERATURE_LABELS["en"])
+        return labels[bisect_right(_TEMPERATURE_CUTOFFS, temp)]
+
+
+# ===========================
+# Interpretation Tables
+# ===========================
+# Labels run from the lowest band to the highest. NDVI/NDMI bands are
+# "value > cutoff" (bisect_left); rainfall/temperature bands are
+# "value < cutoff" (bisect_right).
+
+_NDVI_CUTOFFS = (0.3, 0.4, 0.6)
+_NDVI_LABELS = {
+    "en": ("Low vegetation", "Moderate vegetation", "Good vegetation", "Excellent vegetation"),
+    "hi": ("कम वनस्पति", "मध्यम वनस्पति", "अच्छी वनस्पति", "बहुत अच्छी वनस्पति"),
+    "gu": ("ઓછી વનસ્પતિ", "મધ્યમ વનસ્પતિ", "સારી વનસ્પતિ", "ખૂબ સારી વનસ્પતિ"),
+}
+
+_NDMI_CUTOFFS = (0.2, 0.4)
+_NDMI_LABELS = {
+    "en": ("Low moisture / stress", "Adequate moisture", "High moisture"),
+    "hi": ("कम नमी / तनाव", "पर्याप्त नमी", "अधिक नमी"),
+    "gu": ("ઓછું ભેજ / તાણ", "પૂરતું ભેજ", "વધારે ભેજ"),
+}
+
+_RAINFALL_CUTOFFS = (20, 50, 100, 150)
+_RAINFALL_LABELS = {
+    "en": ("Very low - drought risk", "Low - monitor closely", "Adequate", "Good", "High - flood risk possible"),
+    "hi": ("बहुत कम - सूखा जोखिम", "कम - निगरानी करें", "पर्याप्त", "अच्छा", "अधिक - बाढ़ जोखिम संभव"),
+    "gu": ("ખૂબ ઓછું - સૂકા જોખમ", "ઓછું - નજીકથી નજર રાખો", "પૂરતું", "સારું", "વધારે - પૂર જોખમ શક્ય"),
+}
+
+_TEMPERATURE_CUTOFFS = (10, 20, 30, 35)
+_TEMPERATURE_LABELS = {
+    "en": ("Cold - potential stress", "Cool - good for growth", "Optimal range", "Warm - monitor water", "Hot - heat stress risk"),
+    "hi": ("ठंडा - तनाव संभव", "ठंडा - वृद्धि के लिए अच्छा", "उत्तम सीमा", "गर्म - पानी पर नजर रखें", "बहुत गर्म - गर्मी तनाव जोखिम"),
+    "gu": ("ઠંડું - તાણ શક્ય", "ઠંડક - વૃદ્ધિ માટે સારું", "ઉત્તમ શ્રેણી", "ગરમ - પાણી પર નજર રાખો", "ખૂબ ગરમ - ઉષ્ણતા તાણ જોખમ"),
+}
+
+
+# ===========================
+# Process Pool Workers
+# ===========================
+
+_worker_generator: Optional[PDFGenerator] = None
+
+
+def init_pdf_worker():
+    """Build the per-process PDFGenerator once when a pool worker starts"""
+    global _worker_generator
+    _worker_generator = PDFGenerator()
+
+
+def generate_report_in_worker(output_path: Optional[str] = None, **kwargs) -> Dict:
+    """
+    Picklable entry point for running PDFGenerator.generate_report in a ProcessPoolExecutor
+
+    Streams cannot cross the process boundary, so callers that want the PDF
+    on disk pass output_path and the worker writes the file itself.
+    """
+    if _worker_generator is None:
+        init_pdf_worker()
+    if output_path is None:
+        return _worker_generator.generate_report(**kwargs)
+
+    try:
+        with open(output_path, "wb") as f:
+            return _worker_generator.generate_report(out_stream=f, **kwargs)
+    except Exception:
+        # Don't leave a truncated report behind for /api/download to serve
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
@@ -3,24 +3,67 @@ Satellite Service - Google Earth Engine Integration
 Fetches Sentinel-2 data and calculates vegetation indices (NDVI, NDMI)
 """
 
-import ee
+from __future__ import annotations
+
+import asyncio
+import numpy as np
 import logging
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 from datetime import datetime, timedelta
+from bisect import bisect_left
 import os
+import threading
+
+if TYPE_CHECKING:
+    # Annotations only; the runtime import is deferred to first use
+    import ee
 
 logger = logging.getLogger(__name__)
 
+# Combined mean/min/max/stdDev reducer. Reducers are immutable descriptors,
+# but building one needs an initialized ee, so it is created on first use.
+_stats_reducer: Optional[ee.Reducer] = None
+
+
+def _get_stats_reducer() -> ee.Reducer:
+    global _stats_reducer
+    if _stats_reducer is None:
+        import ee
+        _stats_reducer = ee.Reducer.mean().combine(
+            reducer2=ee.Reducer.minMax(),
+            sharedInputs=True
+        ).combine(
+            reducer2=ee.Reducer.stdDev(),
+            sharedInputs=True
+        )
+    return _stats_reducer
+
 
 class SatelliteService:
     """Service to fetch and analyze Sentinel-2 satellite data"""
     
+    NDVI_CATEGORY_CUTOFFS = (0.2, 0.3, 0.4, 0.6)
+    NDVI_CATEGORY_LABELS = ("Very Poor", "Poor", "Moderate", "Good", "Excellent")
+    
     def __init__(self):
         self.initialized = False
         self.service_account_key = None
+        self._init_lock = threading.Lock()
     
     def initialize(self):
-        """Initialize Google Earth Engine authentication"""
+        """Initialize Google Earth Engine authentication (safe to call repeatedly)"""
+        if self.initialized:
+            return
+        with self._init_lock:
+            # Another thread may have finished while we waited
+            if self.initialized:
+                return
+            self._initialize_ee()
+    
+    def _initialize_ee(self):
+        # earthengine-api is slow to import and only needed once GEE is in use
+        import ee
+        
         try:
             # Try to authenticate with service account
             credentials_path = os.environ.get('GEE_CREDENTIALS_PATH', 'gee-credentials.json')
@@ -39,14 +82,14 @@ class SatelliteService:
                     ee.Initialize(project="farmmonitor-486009")
                     logger.info("GEE initialized with default credentials")
                 except Exception as e:
-                    logger.warning(f"GEE initialization failed: {str(e)}")
+                    logger.warning("GEE initialization failed: %s", e)
                     logger.warning("Satellite features will use mock data")
                     return
             
             self.initialized = True
             
         except Exception as e:
-            logger.error(f"Error initializing Google Earth Engine: {str(e)}")
+            logger.error("Error initializing Google Earth Engine: %s", e)
             logger.warning("Satellite features will use mock data")
     
     def is_initialized(self) -> bool:
@@ -55,7 +98,7 @@ class SatelliteService:
     
     async def get_ndvi_analysis(
         self,
-        polygon_coords: List,
+        ring: np.ndarray,
         center_lat: float,
         center_lng: float,
         days_back: int = 30
@@ -64,7 +107,7 @@ class SatelliteService:
         Get NDVI analysis for a farm polygon
         
         Args:
-            polygon_coords: Polygon coordinates in GeoJSON format
+            ring: Outer polygon ring as an (N, 2) array of [lng, lat]
             center_lat: Center latitude
             center_lng: Center longitude
             days_back: Number of days to look back for imagery
@@ -77,9 +120,11 @@ class SatelliteService:
             logger.warning("GEE not initialized, returning mock data")
             return self._get_mock_satellite_data()
         
+        import ee
+        
         try:
             # Convert polygon to Earth Engine geometry
-            polygon = self._coords_to_ee_polygon(polygon_coords)
+            polygon = self._coords_to_ee_polygon(ring)
             
             # Define date range
             end_date = datetime.now()
@@ -95,26 +140,35 @@ class SatelliteService:
             # Get the least cloudy image
             image = collection.first()
             
-            # Check if image exists
-            image_info = image.getInfo()
-            if image_info is None:
-                logger.warning("No satellite imagery found for this location/date")
-                return self._get_mock_satellite_data()
+            # Calculate NDVI and NDMI (Moisture Index) as one two-band image
+            indices = self._calculate_indices(image)
             
-            # Calculate NDVI
-            ndvi = self._calculate_ndvi(image)
+            # Assemble statistics and metadata server-side and fetch them in a
+            # single round trip; null when no image matched the filters
+            request = ee.Algorithms.If(
+                collection.size().gt(0),
+                ee.Dictionary({
+                    'stats': self._get_statistics(indices, polygon),
+                    'acquisition_date': image.get('system:time_start'),
+                    'cloud_cover': image.get('CLOUDY_PIXEL_PERCENTAGE'),
+                }),
+                None
+            )
+            # getInfo() blocks on HTTPS, so keep it off the event loop
+            summary = await asyncio.to_thread(request.getInfo)
             
-            # Calculate NDMI (Moisture Index)
-            ndmi = self._calculate_ndmi(image)
+            if summary is None:
+                logger.warning("No satellite imagery found for this location/date")
+                return self._get_mock_satellite_data()
             
-            # Get statistics for the polygon
-            ndvi_stats = self._get_statistics(ndvi, polygon)
-            ndmi_stats = self._get_statistics(ndmi, polygon)
+            stats = summary['stats']
+            ndvi_stats = self._band_stats(stats, 'NDVI')
+            ndmi_stats = self._band_stats(stats, 'NDMI')
             
             # Get image metadata
             metadata = {
-                'acquisition_date': image.get('system:time_start').getInfo(),
-                'cloud_cover': image.get('CLOUDY_PIXEL_PERCENTAGE').getInfo(),
+                'acquisition_date': summary.get('acquisition_date'),
+                'cloud_cover': summary.get('cloud_cover'),
                 'satellite': 'Sentinel-2'
             }
             
@@ -131,83 +185,62 @@ class SatelliteService:
             }
             
         except Exception as e:
-            logger.error(f"Error fetching satellite data: {str(e)}")
+            logger.error("Error fetching satellite data: %s", e)
             return self._get_mock_satellite_data()
     
-    def _coords_to_ee_polygon(self, coords: List) -> ee.Geometry.Polygon:
-        """Convert GeoJSON coordinates to Earth Engine polygon"""
-        # GeoJSON format: [[[lng, lat], [lng, lat], ...]]
-        # Earth Engine expects: [[lng, lat], [lng, lat], ...]
-        polygon_coords = coords[0]  # Extract first ring
-        return ee.Geometry.Polygon(polygon_coords)
+    def _coords_to_ee_polygon(self, ring: np.ndarray) -> ee.Geometry.Polygon:
+        """Convert a [lng, lat] ring array to an Earth Engine polygon"""
+        import ee
+        
+        # Earth Engine expects a plain list: [[lng, lat], [lng, lat], ...]
+        return ee.Geometry.Polygon(ring.tolist())
+    
+    def _calculate_indices(self, image: ee.Image) -> ee.Image:
+        """Stack NDVI and NDMI into one image so both reduce in a single pass"""
+        return self._calculate_ndvi(image).addBands(self._calculate_ndmi(image))
     
     def _calculate_ndvi(self, image: ee.Image) -> ee.Image:
         """
         Calculate NDVI (Normalized Difference Vegetation Index)
         NDVI = (NIR - Red) / (NIR + Red)
         """
-        nir = image.select('B8')  # Near-Infrared band
-        red = image.select('B4')  # Red band
-        
-        ndvi = nir.subtract(red).divide(nir.add(red)).rename('NDVI')
-        return ndvi
+        # B8 = Near-Infrared, B4 = Red; one server-side op with float output
+        return image.normalizedDifference(['B8', 'B4']).rename('NDVI')
     
     def _calculate_ndmi(self, image: ee.Image) -> ee.Image:
         """
         Calculate NDMI (Normalized Difference Moisture Index)
         NDMI = (NIR - SWIR) / (NIR + SWIR)
         """
-        nir = image.select('B8')   # Near-Infrared band
-        swir = image.select('B11') # Shortwave Infrared band
-        
-        ndmi = nir.subtract(swir).divide(nir.add(swir)).rename('NDMI')
-        return ndmi
+        # B8 = Near-Infrared, B11 = Shortwave Infrared
+        return image.normalizedDifference(['B8', 'B11']).rename('NDMI')
     
-    def _get_statistics(self, image: ee.Image, geometry: ee.Geometry) -> Dict:
-        """Get statistical values for an image within a geometry"""
-        try:
-            stats = image.reduceRegion(
-                reducer=ee.Reducer.mean().combine(
-                    reducer2=ee.Reducer.minMax(),
-                    sharedInputs=True
-                ).combine(
-                    reducer2=ee.Reducer.stdDev(),
-                    sharedInputs=True
-                ),
-                geometry=geometry,
-                scale=10,  # 10m resolution for Sentinel-2
-                maxPixels=1e9
-            ).getInfo()
-            
-            # Extract values (band name depends on the image)
-            band_name = list(stats.keys())[0].split('_')[0]
-            
-            return {
-                'mean': stats.get(f'{band_name}_mean'),
-                'min': stats.get(f'{band_name}_min'),
-                'max': stats.get(f'{band_name}_max'),
-                'std': stats.get(f'{band_name}_stdDev')
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculating statistics: {str(e)}")
-            return {'mean': None, 'min': None, 'max': None, 'std': None}
+    def _get_statistics(self, image: ee.Image, geometry: ee.Geometry) -> ee.Dictionary:
+        """Build the (unevaluated) per-band statistics of an image within a geometry"""
+        return image.reduceRegion(
+            reducer=_get_stats_reducer(),
+            geometry=geometry,
+            scale=10,  # 10m resolution for Sentinel-2
+            maxPixels=1e9
+        )
+    
+    def _band_stats(self, stats: Dict, band_name: str) -> Dict:
+        """Pick one band's values out of evaluated reduceRegion output"""
+        # Keys come back as '<band>_<stat>', e.g. 'NDVI_mean', 'NDMI_stdDev'
+        return {
+            'mean': stats.get(f'{band_name}_mean'),
+            'min': stats.get(f'{band_name}_min'),
+            'max': stats.get(f'{band_name}_max'),
+            'std': stats.get(f'{band_name}_stdDev')
+        }
     
     def _categorize_ndvi(self, ndvi_value: Optional[float]) -> str:
         """Categorize crop health based on NDVI value"""
         if ndvi_value is None:
             return "Unknown"
         
-        if ndvi_value > 0.6:
-            return "Excellent"
-        elif ndvi_value > 0.4:
-            return "Good"
-        elif ndvi_value > 0.3:
-            return "Moderate"
-        elif ndvi_value > 0.2:
-            return "Poor"
-        else:
-            return "Very Poor"
+        # Categories hold for ndvi > cutoff, lowest first
+        return self.NDVI_CATEGORY_LABELS[bisect_left(self.NDVI_CATEGORY_CUTOFFS, ndvi_value)]
     
     def _get_mock_satellite_data(self) -> Dict:
         """Return mock satellite data when GEE is unavailable"""
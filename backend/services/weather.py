@@ -3,21 +3,300 @@ Weather Service - Open-Meteo Integration
 Fetches historical and forecast weather data
 """
 
-import requests
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+import asyncio
+import httpx
+import orjson
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import logging
+import numpy as np
+import zstandard
 
 logger = logging.getLogger(__name__)
 
+# Redis values are a 1-byte codec tag plus the encoded entry. Untagged
+# values are plain orjson, as written before compression was added.
+_CODEC_ZSTD = b"\x01"
+_zstd_compressor = zstandard.ZstdCompressor(level=3)
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def _encode_entry(entry: Any) -> bytes:
+    return _CODEC_ZSTD + _zstd_compressor.compress(orjson.dumps(entry))
+
+
+def _decode_entry(raw: bytes) -> Any:
+    if raw[:1] == _CODEC_ZSTD:
+        return orjson.loads(_zstd_decompressor.decompress(raw[1:]))
+    return orjson.loads(raw)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Open-Meteo while the circuit breaker is open"""
+
 
 class WeatherService:
     """Service to fetch weather data from Open-Meteo API"""
     
-    def __init__(self):
+    # Transient upstream failures are retried with exponential backoff.
+    # Timeouts aren't retried, and no retry starts once RETRY_BUDGET_SECONDS
+    # have passed, so a dead upstream costs one timeout, not three.
+    MAX_RETRIES = 2
+    RETRY_BACKOFF_SECONDS = 0.2
+    RETRY_BUDGET_SECONDS = 2.0
+    RETRY_STATUSES = frozenset({502, 503, 504})
+    
+    # Circuit breaker: after this many consecutive upstream failures, skip
+    # Open-Meteo for BREAKER_RESET_SECONDS instead of waiting out a timeout
+    # per request. Then one probe request is let through (half-open) while
+    # the rest keep failing fast; its outcome closes or re-opens the breaker.
+    BREAKER_FAIL_MAX = 5
+    BREAKER_RESET_SECONDS = 60
+    
+    # Shared-cache TTLs: the archive window only changes at midnight,
+    # forecasts a few times a day. Forecast entries older than the soft TTL
+    # are still served, but trigger a background refresh.
+    HISTORICAL_CACHE_TTL = 86400
+    FORECAST_CACHE_TTL = 7200
+    FORECAST_SOFT_TTL = 900
+    
+    FORECAST_DAYS = 7
+    
+    # Upper bound on simultaneous lookups in get_weather_analysis_many,
+    # to stay polite with Open-Meteo's rate limits
+    MAX_CONCURRENT_FETCHES = 8
+    
+    # Coordinates are rounded to 2 decimals (~1.1 km) before querying and
+    # caching. Open-Meteo's models are far coarser than that, so nearby farms
+    # get the same weather and share one upstream call.
+    COORD_DECIMALS = 2
+    
+    # Risk thresholds: rainfall in mm over the window, temperatures in °C
+    DROUGHT_RAINFALL_MM = 20
+    FLOOD_RAINFALL_MM = 100
+    TEMP_STRESS_HIGH = 35
+    TEMP_STRESS_LOW = 10
+    
+    # Static query parameters; only coordinates and dates vary per call
+    _HISTORICAL_DAILY_VARS = (
+        "temperature_2m_max",
+        "temperature_2m_min",
+        "temperature_2m_mean",
+        "precipitation_sum",
+        "rain_sum",
+        "et0_fao_evapotranspiration"
+    )
+    _FORECAST_DAILY_VARS = (
+        "temperature_2m_max",
+        "temperature_2m_min",
+        "precipitation_sum",
+        "precipitation_probability_max",
+        "wind_speed_10m_max"
+    )
+    _HISTORICAL_PARAMS = {"daily": _HISTORICAL_DAILY_VARS, "timezone": "auto"}
+    _FORECAST_PARAMS = {"daily": _FORECAST_DAILY_VARS, "timezone": "auto", "forecast_days": FORECAST_DAYS}
+    _COMBINED_PARAMS = {
+        "daily": _HISTORICAL_DAILY_VARS + ("precipitation_probability_max", "wind_speed_10m_max"),
+        "timezone": "auto",
+        "forecast_days": FORECAST_DAYS
+    }
+    
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        redis: Optional[Any] = None,
+        combined_request: bool = True
+    ):
+        """
+        Args:
+            client: Shared HTTP client; one is created (and owned) if omitted
+            redis: Optional redis.asyncio client used as a cross-process
+                response cache for the Open-Meteo fetchers
+            combined_request: Fetch history and forecast in one forecast-API
+                call (past_days); False uses the archive + forecast endpoints
+        """
         self.base_url = "https://api.open-meteo.com/v1"
         self.archive_url = f"{self.base_url}/archive"
         self.forecast_url = f"{self.base_url}/forecast"
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(http2=True, timeout=10.0)
+        self.redis = redis
+        self.combined_request = combined_request
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._probing = False
+    
+    async def close(self):
+        """Close the HTTP client if this service created it"""
+        if self._owns_client:
+            await self.client.aclose()
+    
+    async def _get(self, url: str, params: Dict, headers: Optional[Dict] = None) -> httpx.Response:
+        """GET url through the circuit breaker; fails fast while it is open"""
+        probe = False
+        if self._consecutive_failures >= self.BREAKER_FAIL_MAX:
+            if self._breaker_open():
+                raise CircuitOpenError("Open-Meteo circuit open, skipping request")
+            # Half-open: this request is the single probe
+            self._probing = probe = True
+        
+        try:
+            response = await self._get_with_retries(url, params, headers)
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            # 4xx means a bad request from us, not an unhealthy upstream
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+                self._consecutive_failures = 0
+            else:
+                self._record_failure()
+            raise
+        finally:
+            if probe:
+                self._probing = False
+        
+        self._consecutive_failures = 0
+        return response
+    
+    def _breaker_open(self) -> bool:
+        """True while requests fail fast: open, or half-open with a probe in flight"""
+        return self._consecutive_failures >= self.BREAKER_FAIL_MAX and (
+            self._probing or time.monotonic() < self._open_until
+        )
+    
+    def _record_failure(self):
+        self._consecutive_failures += 1
+        # Once tripped, a failed probe re-opens the breaker straight away
+        if self._consecutive_failures >= self.BREAKER_FAIL_MAX:
+            if time.monotonic() >= self._open_until:
+                logger.warning(
+                    "Open-Meteo failed %d times in a row, pausing requests for %ds",
+                    self._consecutive_failures, self.BREAKER_RESET_SECONDS
+                )
+            self._open_until = time.monotonic() + self.BREAKER_RESET_SECONDS
+    
+    async def _get_with_retries(self, url: str, params: Dict, headers: Optional[Dict] = None) -> httpx.Response:
+        """GET url, retrying refused connections and gateway errors"""
+        started = time.monotonic()
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                response = await self.client.get(url, params=params, headers=headers)
+            except httpx.ConnectError:
+                if self._out_of_retries(attempt, started):
+                    raise
+            else:
+                if self._out_of_retries(attempt, started) or response.status_code not in self.RETRY_STATUSES:
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    return response
+            await asyncio.sleep(self.RETRY_BACKOFF_SECONDS * 2 ** attempt)
+    
+    def _out_of_retries(self, attempt: int, started: float) -> bool:
+        return (
+            attempt == self.MAX_RETRIES
+            or time.monotonic() - started > self.RETRY_BUDGET_SECONDS
+        )
+    
+    async def _get_json(
+        self,
+        url: str,
+        params: Dict,
+        validators: Optional[Dict] = None
+    ) -> Tuple[Optional[Dict], Dict]:
+        """
+        GET and decode url, revalidating with stored ETag/Last-Modified
+        
+        Returns:
+            (data, validators); data is None when upstream answers
+            304 Not Modified, i.e. the caller's copy is still current
+        """
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        
+        response = await self._get(url, params, headers)
+        if response.status_code == 304:
+            return None, validators
+        
+        return orjson.loads(response.content), {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+    
+    def quantize(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        """Snap coordinates to the COORD_DECIMALS grid used upstream and in cache keys"""
+        return round(latitude, self.COORD_DECIMALS), round(longitude, self.COORD_DECIMALS)
+    
+    async def _shared_cached(
+        self,
+        key: str,
+        ttl: int,
+        fetch: Callable[[Optional[Dict]], Awaitable[Tuple[Optional[Dict], Dict]]],
+        soft_ttl: Optional[int] = None
+    ) -> Dict:
+        """
+        Return fetch()'s payload through the Redis cache, if one is configured
+        
+        fetch takes the stored HTTP validators (or None) and returns
+        (payload, validators), with payload None for 304 Not Modified.
+        
+        Entries are kept for ttl seconds. With soft_ttl, an entry older
+        than that is returned as-is while a background fetch revalidates
+        it (stale-while-revalidate).
+        
+        Concurrent misses for the same key share one upstream call. Redis
+        errors are logged and treated as a miss so the API stays up when
+        the cache is down; empty (failed) results are not stored.
+        """
+        if self.redis is not None:
+            try:
+                cached = await self.redis.get(key)
+                if cached is not None:
+                    fetched_at, payload, validators = _decode_entry(cached)
+                    if soft_ttl is not None and time.time() - fetched_at > soft_ttl:
+                        self._start_fetch(key, ttl, fetch, stale=(payload, validators))
+                    return payload
+            except Exception as e:
+                logger.warning("Weather cache read failed for %s: %s", key, e)
+        
+        # Shield so one caller being cancelled doesn't cancel the others
+        return await asyncio.shield(self._start_fetch(key, ttl, fetch))
+    
+    def _start_fetch(
+        self,
+        key: str,
+        ttl: int,
+        fetch: Callable,
+        stale: Optional[Tuple[Dict, Dict]] = None
+    ) -> asyncio.Task:
+        """Return the in-flight fetch for key, starting one if there is none"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(key, ttl, fetch, stale))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+    
+    async def _fetch_and_store(
+        self,
+        key: str,
+        ttl: int,
+        fetch: Callable,
+        stale: Optional[Tuple[Dict, Dict]] = None
+    ) -> Dict:
+        result, validators = await fetch(stale[1] if stale else None)
+        if result is None:
+            # 304: the stale copy is still current, just re-arm its timestamp
+            result = stale[0]
+        if result and self.redis is not None:
+            try:
+                await self.redis.setex(key, ttl, _encode_entry((time.time(), result, validators)))
+            except Exception as e:
+                logger.warning("Weather cache write failed for %s: %s", key, e)
+        return result
     
     async def get_weather_analysis(
         self,
@@ -34,20 +313,34 @@ class WeatherService:
             days_history: Number of historical days to fetch
             
         Returns:
-            Dictionary with weather analysis
+            Dictionary with weather analysis. Data is for the
+            location snapped to the COORD_DECIMALS grid (~1.1 km).
         """
         try:
             # Calculate date ranges
-            end_date = datetime.now().date()
+            end_date = date.today()
             start_date = end_date - timedelta(days=days_history)
             
-            # Fetch historical data
-            historical = self._get_historical_weather(
-                latitude, longitude, start_date, end_date
-            )
+            lat, lng = self.quantize(latitude, longitude)
+            if self.combined_request:
+                combined = await self._shared_cached(
+                    f"wx:comb:{lat}:{lng}:{days_history}:{end_date}",
+                    self.FORECAST_CACHE_TTL,
+                    lambda validators: self._get_combined_weather(lat, lng, days_history, validators),
+                    soft_ttl=self.FORECAST_SOFT_TTL
+                )
+                historical = combined.get("historical", {})
+                forecast = combined.get("forecast", {})
+            else:
+                historical, forecast = await self._get_split_weather(
+                    lat, lng, start_date, end_date
+                )
             
-            # Fetch forecast data
-            forecast = self._get_forecast_weather(latitude, longitude)
+            if not historical.get("dates") and not forecast.get("dates"):
+                # Nothing came back; don't pass an all-zero analysis off as data
+                if self._breaker_open():
+                    logger.info("Open-Meteo circuit open, serving fallback weather data")
+                return self._get_fallback_weather_data()
             
             # Analyze the data
             analysis = self._analyze_weather_data(historical, forecast)
@@ -63,95 +356,196 @@ class WeatherService:
             }
             
         except Exception as e:
-            logger.error(f"Error fetching weather data: {str(e)}")
+            logger.error("Error fetching weather data: %s", e)
             return self._get_fallback_weather_data()
     
-    def _get_historical_weather(
+    async def get_weather_analysis_many(
+        self,
+        points: List[Tuple[float, float]],
+        days_history: int = 30
+    ) -> List[Any]:
+        """
+        get_weather_analysis for many (latitude, longitude) points concurrently
+        
+        At most MAX_CONCURRENT_FETCHES lookups run at once. Results are in
+        the order of points; an unexpected failure is returned in place
+        as its exception rather than failing the whole batch.
+        """
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+        
+        async def _one(point: Tuple[float, float]) -> Dict:
+            async with sem:
+                return await self.get_weather_analysis(*point, days_history=days_history)
+        
+        return await asyncio.gather(*(_one(p) for p in points), return_exceptions=True)
+    
+    async def _get_split_weather(
         self,
         latitude: float,
         longitude: float,
-        start_date: datetime,
-        end_date: datetime
-    ) -> Dict:
-        """Fetch historical weather data from Open-Meteo"""
+        start_date: date,
+        end_date: date
+    ) -> Tuple[Dict, Dict]:
+        """Fetch history from the archive API and the forecast separately"""
+        # The requests are independent, so run them concurrently; each
+        # fetcher returns {} on failure
+        historical, forecast = await asyncio.gather(
+            self._shared_cached(
+                f"wx:hist:{latitude}:{longitude}:{start_date}:{end_date}",
+                self.HISTORICAL_CACHE_TTL,
+                lambda validators: self._get_historical_weather(latitude, longitude, start_date, end_date, validators)
+            ),
+            self._shared_cached(
+                f"wx:fcst:{latitude}:{longitude}:{end_date}",
+                self.FORECAST_CACHE_TTL,
+                lambda validators: self._get_forecast_weather(latitude, longitude, validators),
+                soft_ttl=self.FORECAST_SOFT_TTL
+            )
+        )
+        return historical, forecast
+    
+    async def _get_combined_weather(
+        self,
+        latitude: float,
+        longitude: float,
+        past_days: int,
+        validators: Optional[Dict] = None
+    ) -> Tuple[Optional[Dict], Dict]:
+        """
+        Fetch past days and the forecast in one forecast-API request
+        
+        Returns:
+            ({"historical": ..., "forecast": ...}, validators), shaped like
+            the split fetchers' results (today appears in both); the
+            payload is None if unchanged and {} on failure
+        """
         
         params = {
             "latitude": latitude,
             "longitude": longitude,
-            "start_date": start_date.strftime("%Y-%m-%d"),
-            "end_date": end_date.strftime("%Y-%m-%d"),
-            "daily": [
-                "temperature_2m_max",
-                "temperature_2m_min",
-                "temperature_2m_mean",
-                "precipitation_sum",
-                "rain_sum",
-                "et0_fao_evapotranspiration"
-            ],
-            "timezone": "auto"
+            "past_days": past_days,
+            **self._COMBINED_PARAMS
         }
         
         try:
-            response = requests.get(
-                self.archive_url,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
+            data, validators = await self._get_json(self.forecast_url, params, validators)
+            if data is None:
+                return None, validators
+            daily = data.get("daily") or {}
+            
+            # Days run [past_days..., today, ...future] in the location's
+            # timezone, so split on its local date rather than the server's
+            dates = daily.get("time", [])
+            offset = timedelta(seconds=data.get("utc_offset_seconds") or 0)
+            local_today = (datetime.now(timezone.utc) + offset).date().isoformat()
+            try:
+                today = dates.index(local_today)
+            except ValueError:
+                # Not in the response (clock skew); fall back to its layout
+                today = min(past_days, len(dates))
+            past = slice(0, today + 1)
+            ahead = slice(today, None)
+            
+            return ({
+                "historical": {
+                    "dates": dates[past],
+                    "temp_max": daily.get("temperature_2m_max", [])[past],
+                    "temp_min": daily.get("temperature_2m_min", [])[past],
+                    "temp_mean": daily.get("temperature_2m_mean", [])[past],
+                    "precipitation": daily.get("precipitation_sum", [])[past],
+                    "rain": daily.get("rain_sum", [])[past],
+                    "evapotranspiration": daily.get("et0_fao_evapotranspiration", [])[past]
+                },
+                "forecast": {
+                    "dates": dates[ahead],
+                    "temp_max": daily.get("temperature_2m_max", [])[ahead],
+                    "temp_min": daily.get("temperature_2m_min", [])[ahead],
+                    "precipitation": daily.get("precipitation_sum", [])[ahead],
+                    "precipitation_probability": daily.get("precipitation_probability_max", [])[ahead],
+                    "wind_speed": daily.get("wind_speed_10m_max", [])[ahead]
+                }
+            }, validators)
+            
+        except CircuitOpenError:
+            return {}, {}
+        except Exception as e:
+            logger.error("Error fetching combined weather: %s", e)
+            return {}, {}
+    
+    async def _get_historical_weather(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: date,
+        end_date: date,
+        validators: Optional[Dict] = None
+    ) -> Tuple[Optional[Dict], Dict]:
+        """Fetch historical weather data from Open-Meteo as (data, validators)"""
+        
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            **self._HISTORICAL_PARAMS
+        }
+        
+        try:
+            data, validators = await self._get_json(self.archive_url, params, validators)
+            if data is None:
+                return None, validators
+            daily = data.get("daily") or {}
             
             return {
-                "dates": data.get("daily", {}).get("time", []),
-                "temp_max": data.get("daily", {}).get("temperature_2m_max", []),
-                "temp_min": data.get("daily", {}).get("temperature_2m_min", []),
-                "temp_mean": data.get("daily", {}).get("temperature_2m_mean", []),
-                "precipitation": data.get("daily", {}).get("precipitation_sum", []),
-                "rain": data.get("daily", {}).get("rain_sum", []),
-                "evapotranspiration": data.get("daily", {}).get("et0_fao_evapotranspiration", [])
-            }
+                "dates": daily.get("time", []),
+                "temp_max": daily.get("temperature_2m_max", []),
+                "temp_min": daily.get("temperature_2m_min", []),
+                "temp_mean": daily.get("temperature_2m_mean", []),
+                "precipitation": daily.get("precipitation_sum", []),
+                "rain": daily.get("rain_sum", []),
+                "evapotranspiration": daily.get("et0_fao_evapotranspiration", [])
+            }, validators
             
+        except CircuitOpenError:
+            return {}, {}
         except Exception as e:
-            logger.error(f"Error fetching historical weather: {str(e)}")
-            return {}
+            logger.error("Error fetching historical weather: %s", e)
+            return {}, {}
     
-    def _get_forecast_weather(self, latitude: float, longitude: float) -> Dict:
-        """Fetch 7-day weather forecast from Open-Meteo"""
+    async def _get_forecast_weather(
+        self,
+        latitude: float,
+        longitude: float,
+        validators: Optional[Dict] = None
+    ) -> Tuple[Optional[Dict], Dict]:
+        """Fetch 7-day weather forecast from Open-Meteo as (data, validators)"""
         
         params = {
             "latitude": latitude,
             "longitude": longitude,
-            "daily": [
-                "temperature_2m_max",
-                "temperature_2m_min",
-                "precipitation_sum",
-                "precipitation_probability_max",
-                "wind_speed_10m_max"
-            ],
-            "timezone": "auto",
-            "forecast_days": 7
+            **self._FORECAST_PARAMS
         }
         
         try:
-            response = requests.get(
-                self.forecast_url,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
+            data, validators = await self._get_json(self.forecast_url, params, validators)
+            if data is None:
+                return None, validators
+            daily = data.get("daily") or {}
             
             return {
-                "dates": data.get("daily", {}).get("time", []),
-                "temp_max": data.get("daily", {}).get("temperature_2m_max", []),
-                "temp_min": data.get("daily", {}).get("temperature_2m_min", []),
-                "precipitation": data.get("daily", {}).get("precipitation_sum", []),
-                "precipitation_probability": data.get("daily", {}).get("precipitation_probability_max", []),
-                "wind_speed": data.get("daily", {}).get("wind_speed_10m_max", [])
-            }
+                "dates": daily.get("time", []),
+                "temp_max": daily.get("temperature_2m_max", []),
+                "temp_min": daily.get("temperature_2m_min", []),
+                "precipitation": daily.get("precipitation_sum", []),
+                "precipitation_probability": daily.get("precipitation_probability_max", []),
+                "wind_speed": daily.get("wind_speed_10m_max", [])
+            }, validators
             
+        except CircuitOpenError:
+            return {}, {}
         except Exception as e:
-            logger.error(f"Error fetching forecast: {str(e)}")
-            return {}
+            logger.error("Error fetching forecast: %s", e)
+            return {}, {}
     
     def _analyze_weather_data(self, historical: Dict, forecast: Dict) -> Dict:
         """Analyze weather data and extract insights"""
@@ -166,36 +560,40 @@ class WeatherService:
             "flood_risk": False
         }
         
-        # Historical analysis
-        if historical.get("precipitation"):
-            rainfall = historical["precipitation"]
-            analysis["total_rainfall_30d"] = sum(rainfall)
+        # Historical analysis (missing daily values arrive as None -> NaN)
+        rainfall = np.asarray(historical.get("precipitation") or [], dtype=np.float64)
+        # Prefix sums: rainfall over days [i, j) is rain_cs[j] - rain_cs[i]
+        rain_cs = np.concatenate(([0.0], np.nancumsum(rainfall)))
+        if rainfall.size:
+            analysis["total_rainfall_30d"] = float(rain_cs[-1])
             
             # Check drought risk (less than 20mm in 30 days)
-            if analysis["total_rainfall_30d"] < 20:
+            if analysis["total_rainfall_30d"] < self.DROUGHT_RAINFALL_MM:
                 analysis["drought_risk"] = True
         
-        if historical.get("temp_mean"):
-            temps = [t for t in historical["temp_mean"] if t is not None]
-            if temps:
-                analysis["avg_temperature"] = sum(temps) / len(temps)
-                
-                # Check temperature stress (avg > 35°C or < 10°C)
-                if analysis["avg_temperature"] > 35 or analysis["avg_temperature"] < 10:
-                    analysis["temperature_stress"] = True
+        temps = np.asarray(historical.get("temp_mean") or [], dtype=np.float64)
+        temps = temps[~np.isnan(temps)]
+        if temps.size:
+            analysis["avg_temperature"] = float(temps.mean())
+            
+            # Check temperature stress (avg > 35°C or < 10°C)
+            avg_temp = analysis["avg_temperature"]
+            if avg_temp > self.TEMP_STRESS_HIGH or avg_temp < self.TEMP_STRESS_LOW:
+                analysis["temperature_stress"] = True
         
         # Forecast analysis
-        if forecast.get("precipitation"):
-            analysis["forecast_rain_7d"] = sum(forecast["precipitation"])
+        forecast_rain = np.asarray(forecast.get("precipitation") or [], dtype=np.float64)
+        if forecast_rain.size:
+            analysis["forecast_rain_7d"] = float(np.nansum(forecast_rain))
             
             # Check flood risk (>100mm in next 7 days)
-            if analysis["forecast_rain_7d"] > 100:
+            if analysis["forecast_rain_7d"] > self.FLOOD_RAINFALL_MM:
                 analysis["flood_risk"] = True
         
         # Rainfall trend
-        if historical.get("precipitation") and len(historical["precipitation"]) >= 14:
-            recent = sum(historical["precipitation"][-7:])
-            previous = sum(historical["precipitation"][-14:-7])
+        if rainfall.size >= 14:
+            recent = rain_cs[-1] - rain_cs[-8]
+            previous = rain_cs[-8] - rain_cs[-15]
             
             if recent > previous * 1.5:
                 analysis["rainfall_trend"] = "increasing"
@@ -60,4 +60,6 @@ echo Docs: http://localhost:8000/docs
 echo Press Ctrl+C to stop
 echo.
 
+REM Local runs default to development mode (auto-reload, single worker)
+if not defined ENVIRONMENT set ENVIRONMENT=development
 python main.py
@@ -57,4 +57,6 @@ echo "API Documentation: http://localhost:8000/docs"
 echo "Press Ctrl+C to stop"
 echo ""
 
+# Local runs default to development mode (auto-reload, single worker)
+export ENVIRONMENT="${ENVIRONMENT:-development}"
 python main.py
@@ -69,7 +69,9 @@ async function checkServerHealth() {
 // Download PDF file
 async function downloadPDF(pdfUrl, filename) {
     try {
-        const response = await fetch(pdfUrl);
+        // Backend returns paths like /api/download/<id>.pdf relative to the API host
+        const source = pdfUrl.startsWith('/') ? `${API_CONFIG.baseURL}${pdfUrl}` : pdfUrl;
+        const response = await fetch(source);
         const blob = await response.blob();
         
         // Create download link